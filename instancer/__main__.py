@@ -9,6 +9,10 @@ from instancer.util.logger import logger
 from instancer.builder import build_all_challenges
 
 
+# TODO(es3n1n): add winloop support when it can do `create_pipe_connection`
+_LOOP = 'uvloop' if find_spec('uvloop') else 'asyncio'
+
+
 def main() -> None:
     build_all_challenges()
     Process(target=prunner_process, daemon=True).start()
@@ -19,11 +23,11 @@ def main() -> None:
         host=config.BIND_HOST,
         port=config.BIND_PORT,
         workers=config.WEB_WORKERS,
-        # TODO(es3n1n): add winloop support when it can do `create_pipe_connection`
-        loop='uvloop' if find_spec('uvloop') else 'asyncio',
+        loop=_LOOP,
         server_header=False,
         forwarded_allow_ips='*',
         proxy_headers=config.USE_PROXY_HEADERS,
+        log_config=None,
     )
 
 
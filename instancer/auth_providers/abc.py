@@ -7,6 +7,9 @@ if TYPE_CHECKING:
     from fastapi import Request
 
 
+BEARER_PREFIX = 'bearer '
+
+
 @dataclass(frozen=True)
 class InnerAuthSession:
     team_id: str
@@ -20,15 +23,18 @@ class AuthProviderABC(ABC):
     async def authenticate(self, request: Request) -> InnerAuthSession:
         """Authenticate a user based on the incoming request."""
 
+    async def close(self) -> None:  # noqa: B027
+        """Release any resources held by the provider."""
+
 
 def extract_token(request: Request) -> str | None:
     # FIXME(es3n1n): this ideally should be using fastapi's dependency injection
     auth_header = request.headers.get('Authorization')
-    if not auth_header:
+    if not auth_header or auth_header[: len(BEARER_PREFIX)].lower() != BEARER_PREFIX:
         return None
 
-    parts = auth_header.split(' ')
-    if len(parts) != 2 or parts[0].lower() != 'bearer':  # noqa: PLR2004
+    token = auth_header[len(BEARER_PREFIX) :]
+    if ' ' in token:
         return None
 
-    return parts[1]
+    return token or None
@@ -1,9 +1,15 @@
+from typing import Any
+
 import jwt
 from fastapi import HTTPException, Request
+from jwt.utils import base64url_encode
 
 from .abc import AuthProviderABC, InnerAuthSession, extract_token
 
 
+DECODE_OPTIONS: dict[str, Any] = {'require': ['team_id'], 'verify_signature': True}
+
+
 class CTFdAuthProvider(AuthProviderABC):
     def __init__(self, args: dict[str, str]) -> None:
         super().__init__(args)
@@ -13,17 +19,27 @@ class CTFdAuthProvider(AuthProviderABC):
             msg = 'secret argument is required for CTFdAuthProvider'
             raise ValueError(msg)
 
+        self._key = jwt.PyJWK({'kty': 'oct', 'k': base64url_encode(self.secret.encode()).decode()}, algorithm='HS256')
+
     async def authenticate(self, request: Request) -> InnerAuthSession:
         token = extract_token(request)
         if not token:
             raise HTTPException(status_code=401, detail='Authorization token is missing')
 
         try:
-            payload = jwt.decode(token, self.secret, algorithms=['HS256'])
-        except jwt.InvalidTokenError:
-            raise HTTPException(status_code=403, detail='Invalid authorization token')
-
-        team_id = payload.get('team_id')
+            payload = jwt.decode(
+                token,
+                self._key,
+                algorithms=['HS256'],
+                options=DECODE_OPTIONS,
+            )
+        except jwt.MissingRequiredClaimError as err:
+            raise HTTPException(status_code=403, detail='Token missing team_id') from err
+        except jwt.InvalidTokenError as err:
+            raise HTTPException(status_code=403, detail='Invalid authorization token') from err
+
+        # `require` only rejects a missing claim, empty or falsy team ids are not valid either
+        team_id = payload['team_id']
         if not team_id:
             raise HTTPException(status_code=403, detail='Token missing team_id')
 
@@ -1,14 +1,38 @@
+import hashlib
 import http
+from typing import Any
 
-import orjson
+import msgspec
+from cachetools import TTLCache
 from fastapi import HTTPException, Request
-from httpx import AsyncClient, HTTPError
+from httpx import AsyncClient, HTTPError, Limits, Timeout
 
 from instancer.core.cache import cache_token, try_get_team_id_by_token
+from instancer.core.config import config
 
 from .abc import AuthProviderABC, InnerAuthSession, extract_token
 
 
+# Only statuses where rCTF has definitively rejected the token, anything else (rate limits, timeouts) may succeed later
+REJECTED_TOKEN_STATUSES = frozenset({http.HTTPStatus.UNAUTHORIZED.value, http.HTTPStatus.FORBIDDEN.value})
+
+
+class RCTFUserResponse(msgspec.Struct):
+    kind: Any = None
+    data: Any = None
+
+
+_user_response_decoder = msgspec.json.Decoder(RCTFUserResponse)
+
+
+def _invalid_token_error() -> HTTPException:
+    return HTTPException(status_code=http.HTTPStatus.FORBIDDEN.value, detail='Invalid authorization token')
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
 class RCTFAuthProvider(AuthProviderABC):
     def __init__(self, args: dict[str, str]) -> None:
         super().__init__(args)
@@ -19,41 +43,77 @@ class RCTFAuthProvider(AuthProviderABC):
             raise ValueError(msg)
 
         self.rctf_url = self.rctf_url.rstrip('/')
+        self._me_url = f'{self.rctf_url}/api/v1/users/me'
+
+        self.client = AsyncClient(
+            http2=True,
+            timeout=Timeout(5.0),
+            limits=Limits(max_connections=100, max_keepalive_connections=20),
+        )
+
+        self.sessions: TTLCache[bytes, InnerAuthSession] = TTLCache(
+            maxsize=config.AUTH_LOCAL_CACHE_SIZE,
+            ttl=config.AUTH_CACHE_LIFE_TIME,
+        )
+        self.rejected: TTLCache[bytes, bool] = TTLCache(
+            maxsize=config.AUTH_LOCAL_CACHE_SIZE,
+            ttl=config.AUTH_NEGATIVE_CACHE_LIFE_TIME,
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
 
     async def authenticate(self, request: Request) -> InnerAuthSession:
         token = extract_token(request)
         if not token:
             raise HTTPException(status_code=401, detail='Authorization token is missing')
 
-        cached = await try_get_team_id_by_token(token)
-        if cached is not None:
-            return InnerAuthSession(team_id=cached)
-
-        async with AsyncClient() as client:
-            try:
-                r = await client.get(
-                    f'{self.rctf_url}/api/v1/users/me',
-                    headers={'Authorization': f'Bearer {token}'},
-                )
-            except HTTPError as err:
-                raise HTTPException(
-                    status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR.value, detail='Internal rCTF error'
-                ) from err
-
-            if r.status_code != http.HTTPStatus.OK.value:
-                raise HTTPException(status_code=http.HTTPStatus.FORBIDDEN.value, detail='Invalid authorization token')
-
-            resp_json = orjson.loads(r.content)
-            kind = resp_json.get('kind')
-            data = resp_json.get('data', {})
-            if kind not in {'goodUserData', 'goodUserSelfData'}:
-                raise HTTPException(status_code=http.HTTPStatus.FORBIDDEN.value, detail='Invalid authorization token')
-
-            team_id = data.get('id')
-            if not team_id:
-                raise HTTPException(
-                    status_code=http.HTTPStatus.FORBIDDEN.value, detail='No team ID associated with token'
-                )
-
-            await cache_token(token=token, team_id=str(team_id))
-            return InnerAuthSession(team_id=str(team_id))
+        digest = _token_digest(token)
+        session = self.sessions.get(digest)
+        if session is not None:
+            return session
+
+        if digest in self.rejected:
+            raise _invalid_token_error()
+
+        team_id = await try_get_team_id_by_token(token)
+        if team_id is None:
+            team_id = await self._fetch_team_id(token, digest)
+            await cache_token(token=token, team_id=team_id)
+
+        session = InnerAuthSession(team_id=team_id)
+        self.sessions[digest] = session
+        return session
+
+    async def _fetch_team_id(self, token: str, digest: bytes) -> str:
+        try:
+            r = await self.client.get(self._me_url, headers={'Authorization': f'Bearer {token}'})
+        except HTTPError as err:
+            raise HTTPException(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR.value, detail='Internal rCTF error'
+            ) from err
+
+        if r.status_code != http.HTTPStatus.OK.value:
+            if r.status_code in REJECTED_TOKEN_STATUSES:
+                self.rejected[digest] = True
+            raise _invalid_token_error()
+
+        try:
+            resp = _user_response_decoder.decode(r.content)
+        except msgspec.ValidationError as err:
+            self.rejected[digest] = True
+            raise _invalid_token_error() from err
+        except msgspec.DecodeError as err:
+            raise HTTPException(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR.value, detail='Internal rCTF error'
+            ) from err
+
+        if resp.kind not in {'goodUserData', 'goodUserSelfData'}:
+            self.rejected[digest] = True
+            raise _invalid_token_error()
+
+        team_id = resp.data.get('id') if isinstance(resp.data, dict) else None
+        if not team_id:
+            raise HTTPException(status_code=http.HTTPStatus.FORBIDDEN.value, detail='No team ID associated with token')
+
+        return str(team_id)
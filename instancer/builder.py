@@ -1,32 +1,75 @@
+import asyncio
+import hashlib
+import json
 import os
 import re
 import yaml
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
+from aiodocker import Docker
 from instancer.core.config import config
 from instancer.util.logger import logger
 
-def run_command(command: List[str], cwd: Optional[Path] = None) -> None:
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+_SANITIZE_RE = re.compile(r'[^a-z0-9-]+')
+_CHALLENGE_FILE_NAMES = ('challenge.yml', 'challenge.yaml')
+_HTTPS_PORTS = frozenset({80, 8000, 3000})
+
+def run_command(command: List[str], cwd: Optional[Path] = None, *, quiet: bool = False) -> None:
     """
     Execute a shell command in a specified directory.
 
     Args:
         command: List of command arguments.
         cwd: Directory context for execution. Defaults to current working directory.
+        quiet: Discard the command output instead of passing it through.
     
     Raises:
         subprocess.CalledProcessError: If the command returns a non-zero exit code.
     """
-    logger.info(f"Running command: {' '.join(command)} in {cwd or os.getcwd()}")
-    subprocess.check_call(command, cwd=str(cwd) if cwd else None)
+    logger.opt(lazy=True).info(
+        'Running command: {} in {}', lambda: ' '.join(command), lambda: cwd or os.getcwd()
+    )
+    output = subprocess.DEVNULL if quiet else None
+    subprocess.check_call(command, cwd=str(cwd) if cwd else None, stdout=output, stderr=output)
+
+def tag_images(tags: List[Tuple[str, str]]) -> None:
+    """
+    Apply image tags through a single docker daemon connection instead of spawning `docker tag` per image.
+
+    Args:
+        tags: List of tuples (source_tag, target_tag).
+    """
+    if tags:
+        asyncio.run(_tag_images(tags))
+
+async def _tag_images(tags: List[Tuple[str, str]]) -> None:
+    try:
+        async with Docker() as docker:
+            tag_coroutines = []
+            for src, dst in tags:
+                repo, _, tag = dst.rpartition(':')
+                tag_coroutines.append(docker.images.tag(src, repo, tag=tag))
+
+            results = await asyncio.gather(*tag_coroutines, return_exceptions=True)
+    except Exception as e:
+        logger.error(f"Failed to tag images {', '.join(dst for _, dst in tags)}: {e}")
+        return
 
-def parse_compose(compose_path: Path, category: str, challenge_name: str) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
+    for (src, dst), result in zip(tags, results, strict=True):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to tag {src} as {dst}: {result}")
+
+def parse_compose(compose: Dict[str, Any], category: str, challenge_name: str) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
     """
-    Parse a docker-compose.yml file to extract container configuration and image tags.
+    Extract container configuration and image tags from a parsed docker-compose.yml.
 
     Args:
-        compose_path: Path to the docker-compose.yml file.
+        compose: Parsed docker-compose.yml contents.
         category: Challenge category (e.g., 'web').
         challenge_name: Name of the challenge.
 
@@ -35,9 +78,6 @@ def parse_compose(compose_path: Path, category: str, challenge_name: str) -> Tup
         - List of container dictionaries with configuration.
         - List of tuples for image tagging (source_tag, target_tag).
     """
-    with open(compose_path, 'r') as f:
-        compose = yaml.safe_load(f)
-
     containers = []
     tags_to_apply = []
     services = compose.get('services', {})
@@ -103,19 +143,16 @@ def parse_compose(compose_path: Path, category: str, challenge_name: str) -> Tup
         
     return containers, tags_to_apply
 
-def get_exposed_ports(compose_path: Path) -> List[Dict[str, Any]]:
+def get_exposed_ports(compose: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    Extract exposed ports from a docker-compose.yml file.
+    Extract exposed ports from a parsed docker-compose.yml.
 
     Args:
-        compose_path: Path to the docker-compose.yml file.
+        compose: Parsed docker-compose.yml contents.
 
     Returns:
         List of dictionaries defining exposed ports with their protocol kind.
     """
-    with open(compose_path, 'r') as f:
-        compose = yaml.safe_load(f)
-        
     exposed = []
     services = compose.get('services', {})
     
@@ -130,10 +167,7 @@ def get_exposed_ports(compose_path: Path) -> List[Dict[str, Any]]:
             else:
                 continue
 
-            if container_port in (80, 8000, 3000):
-                kind = 'https'
-            else:
-                kind = 'tcp'
+            kind = 'https' if container_port in _HTTPS_PORTS else 'tcp'
        
             exposed.append({
                 'kind': kind,
@@ -144,7 +178,9 @@ def get_exposed_ports(compose_path: Path) -> List[Dict[str, Any]]:
     return exposed
 
 
-def process_challenge(challenge_path: Path, category: str, name: str) -> Optional[Dict[str, Any]]:
+def process_challenge(
+    challenge_path: Path, category: str, name: str, build_cache: Optional[Dict[str, str]] = None
+) -> Optional[Dict[str, Any]]:
     """
     Process a single challenge directory to generate its configuration.
 
@@ -152,6 +188,8 @@ def process_challenge(challenge_path: Path, category: str, name: str) -> Optiona
         challenge_path: Path to the challenge.yml file.
         category: Challenge category.
         name: Challenge name.
+        build_cache: Build cache manifest. When given, the docker build is skipped if its inputs are unchanged
+            since the last successful build, and the manifest is updated after a successful build.
 
     Returns:
         Dictionary containing the challenge configuration, or None if processing fails.
@@ -159,8 +197,11 @@ def process_challenge(challenge_path: Path, category: str, name: str) -> Optiona
     logger.info(f"Processing challenge: {category}/{name}")
     
     try:
-        with open(challenge_path, 'r') as f:
-            chal_config = yaml.safe_load(f)
+        raw_config = challenge_path.read_bytes()
+        # Only challenges with a dashboard section are deployable, skip the others without parsing them
+        if b'dashboard' not in raw_config:
+            return None
+        chal_config = yaml.load(raw_config, Loader=_YamlLoader)  # noqa: S506
     except Exception as e:
         logger.error(f"Failed to read {challenge_path}: {e}")
         return None
@@ -181,20 +222,36 @@ def process_challenge(challenge_path: Path, category: str, name: str) -> Optiona
         logger.error(f"Compose file not found: {abs_compose_path}")
         return None
 
-    try:
-        run_command(['docker', 'compose', '-p', name, '-f', str(abs_compose_path), 'build'], cwd=challenge_dir)
-    except Exception as e:
-        logger.error(f"Failed to build challenge {name}: {e}")
-        return None
+    compose_bytes = abs_compose_path.read_bytes()
+    compose = yaml.load(compose_bytes, Loader=_YamlLoader)  # noqa: S506
+    containers, tags = parse_compose(compose, category, name)
+    expose = get_exposed_ports(compose)
 
-    containers, tags = parse_compose(abs_compose_path, category, name)
-    expose = get_exposed_ports(abs_compose_path)
-    
-    for src, dst in tags:
+    cache_name = f'{category}/{name}'
+    build_key = (
+        _compute_build_key(challenge_dir, compose_bytes, _get_build_inputs(compose, abs_compose_path.parent))
+        if build_cache is not None
+        else None
+    )
+    is_up_to_date = (
+        build_cache is not None
+        and build_cache.get(cache_name) == build_key
+        and _images_exist(_get_built_images(compose, name))
+    )
+
+    if is_up_to_date:
+        logger.info(f"Build inputs of {cache_name} are unchanged, skipping build")
+    else:
         try:
-            run_command(['docker', 'tag', src, dst])
+            run_command(['docker', 'compose', '-p', name, '-f', str(abs_compose_path), 'build'], cwd=challenge_dir)
         except Exception as e:
-            logger.error(f"Failed to tag {src} as {dst}: {e}")
+            logger.error(f"Failed to build challenge {name}: {e}")
+            return None
+
+        if build_cache is not None and build_key is not None:
+            build_cache[cache_name] = build_key
+    
+    tag_images(tags)
 
     return {
         'name': name,
@@ -202,16 +259,169 @@ def process_challenge(challenge_path: Path, category: str, name: str) -> Optiona
         'containers': containers,
         'expose': expose
     }
+
+def _get_built_images(compose: Dict[str, Any], project: str) -> List[str]:
+    """
+    List the images `docker compose build` produces for the services of a compose file.
+
+    Args:
+        compose: Parsed docker-compose.yml contents.
+        project: Compose project name the services are built under.
+
+    Returns:
+        The `image` of every service with a `build` section, or the `{project}-{service}:latest` name compose
+        gives it when no image is set.
+    """
+    return [
+        service_config.get('image') or f'{project}-{service_name}:latest'
+        for service_name, service_config in (compose.get('services') or {}).items()
+        if service_config.get('build')
+    ]
+
+def _get_build_inputs(compose: Dict[str, Any], compose_dir: Path) -> List[Path]:
+    """
+    Resolve the local paths docker compose reads while building the services of a compose file.
+
+    Args:
+        compose: Parsed docker-compose.yml contents.
+        compose_dir: Directory containing the docker-compose.yml file, relative build paths are resolved against it.
+
+    Returns:
+        Sorted list of existing build contexts, dockerfiles and additional contexts.
+    """
+    inputs = set()
+    for service_config in (compose.get('services') or {}).values():
+        build = service_config.get('build')
+        if not build:
+            continue
+        if isinstance(build, str):
+            build = {'context': build}
+
+        context = (compose_dir / build.get('context', '.')).resolve()
+        inputs.add(context)
+        if build.get('dockerfile'):
+            inputs.add((context / build['dockerfile']).resolve())
+
+        additional_contexts = build.get('additional_contexts') or {}
+        if isinstance(additional_contexts, list):
+            additional_contexts = dict(item.split('=', 1) for item in additional_contexts if '=' in item)
+        for path in additional_contexts.values():
+            inputs.add((compose_dir / path).resolve())
+
+    # Remote contexts (git urls, docker-image:// and so on) don't resolve to anything on disk
+    return sorted(path for path in inputs if path.exists())
+
+def _compute_build_key(challenge_dir: Path, compose_bytes: bytes, build_inputs: List[Path]) -> str:
+    """
+    Compute a key identifying the build inputs of a challenge.
+
+    The key covers the compose file contents and the path, size and mtime of every file in the challenge
+    directory and in every build input, so that editing any source file invalidates it without having to
+    read the whole tree.
+
+    Args:
+        challenge_dir: Directory containing the challenge.yml file.
+        compose_bytes: Raw contents of the docker-compose.yml file.
+        build_inputs: Build contexts and dockerfiles referenced by the compose file, see `_get_build_inputs`.
+
+    Returns:
+        Hex digest of the build inputs.
+    """
+    digest = hashlib.blake2b(compose_bytes)
+    for root in [challenge_dir.resolve(), *build_inputs]:
+        digest.update(f'{root}\n'.encode())
+        files = [root] if root.is_file() else sorted(p for p in root.rglob('*') if p.is_file())
+        for file_path in files:
+            st = file_path.stat()
+            digest.update(f'{file_path.relative_to(root)}:{st.st_size}:{st.st_mtime_ns}\n'.encode())
+    return digest.hexdigest()
+
+def _images_exist(images: List[str]) -> bool:
+    """
+    Check whether all of the given images are present in the local docker daemon.
+    """
+    if not images:
+        return True
+    try:
+        run_command(['docker', 'image', 'inspect', *images], quiet=True)
+    except subprocess.CalledProcessError:
+        return False
+    return True
+
+def _load_build_cache() -> Dict[str, str]:
+    """
+    Load the build cache manifest mapping challenges to the key of their last successful build.
+    """
+    try:
+        return json.loads(Path(config.BUILD_CACHE_PATH).read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+def _save_build_cache(build_cache: Dict[str, str]) -> None:
+    """
+    Persist the build cache manifest.
+    """
+    try:
+        Path(config.BUILD_CACHE_PATH).write_text(json.dumps(build_cache, indent=2, sort_keys=True))
+    except OSError as e:
+        logger.warning(f"Failed to write build cache {config.BUILD_CACHE_PATH}: {e}")
+
 def _sanitize_name(name: str) -> str:
     """
     Sanitize the name to ensure it contains only lowercase alphanumeric characters and hyphens.
     """
-    # Convert to lowercase
-    name = name.lower()
-    # Replace invalid characters with hyphens
-    name = re.sub(r'[^a-z0-9-]+', '-', name)
-    # Strip leading/trailing hyphens
-    return name.strip('-')
+    # Lowercase, replace invalid characters with hyphens and strip leading/trailing hyphens
+    return _SANITIZE_RE.sub('-', name.lower()).strip('-')
+
+def _process_challenge_file(c_yaml: Path, build_cache: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Process a discovered challenge.yml, deriving its category and name from the directory layout.
+
+    Args:
+        c_yaml: Path to the challenge.yml file.
+        build_cache: Build cache manifest, see `process_challenge`.
+
+    Returns:
+        Dictionary containing the challenge configuration, or None if processing fails.
+    """
+    challenge_dir = c_yaml.parent
+    try:
+        category_name = _sanitize_name(challenge_dir.parent.name)
+        challenge_name = _sanitize_name(challenge_dir.name)
+
+        return process_challenge(c_yaml, category_name, challenge_name, build_cache)
+    except Exception as e:
+        logger.error(f"Error processing {c_yaml}: {e}")
+        return None
+
+def _find_challenge_files(root: Path) -> List[Path]:
+    """
+    Recursively find challenge files in a single directory walk.
+
+    Args:
+        root: Directory to search.
+
+    Returns:
+        List of challenge file paths, at most one per directory (challenge.yml is preferred over challenge.yaml).
+    """
+    challenge_files = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        found: Dict[str, str] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.name in _CHALLENGE_FILE_NAMES and entry.is_file():
+                    found[entry.name] = entry.path
+
+        for name in _CHALLENGE_FILE_NAMES:
+            if name in found:
+                challenge_files.append(Path(found[name]))
+                break
+
+    return challenge_files
 
 def build_all_challenges() -> None:
     """
@@ -221,30 +431,18 @@ def build_all_challenges() -> None:
     
     challenges_dir = Path(config.CHALLENGES_PATH)
 
-    challenges_list = []
+    challenge_files = _find_challenge_files(challenges_dir)
     
-    # Updated to search recursively for challenge.yml/yaml files
-    challenge_files = list(challenges_dir.rglob('challenge.yml')) + list(challenges_dir.rglob('challenge.yaml'))
-    # Deduplicate
-    challenge_files = list(set(challenge_files))
-    
-    for c_yaml in challenge_files:
-        challenge_dir = c_yaml.parent
-        try:
-             category_name = _sanitize_name(challenge_dir.parent.name)
-             challenge_name = _sanitize_name(challenge_dir.name)
+    build_cache = _load_build_cache()
 
-             data = process_challenge(c_yaml, category_name, challenge_name)
-             if data:
-                 challenges_list.append(data)
-        except Exception as e:
-             logger.error(f"Error processing {c_yaml}: {e}")
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(lambda c_yaml: _process_challenge_file(c_yaml, build_cache), challenge_files)
+        # Sort by name to keep the generated file stable regardless of discovery order
+        challenges_list = sorted((data for data in results if data), key=lambda chal: chal['name'])
+
+    _save_build_cache(build_cache)
 
     with open(config.CHALLENGES_YAML_PATH, 'w') as f:
         f.write("# Generated by instancer.builder\n")
-        
-        for i, chal in enumerate(challenges_list):
-            yaml.dump(chal, f, default_flow_style=False, sort_keys=False)
-            if i < len(challenges_list) - 1:
-                f.write("---\n")
+        yaml.dump_all(challenges_list, f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
 
@@ -1,3 +1,4 @@
+from functools import cache
 from typing import Annotated
 
 from fastapi import Depends
@@ -9,6 +10,7 @@ from instancer.auth_providers.ctfd import CTFdAuthProvider
 from instancer.core.config import AuthProvider, config
 
 
+@cache
 def get_auth_provider() -> AuthProviderABC:
     if config.AUTH_PROVIDER == AuthProvider.LOCAL:
         return LocalAuthProvider(config.AUTH_PROVIDER_ARGS)
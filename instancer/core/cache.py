@@ -1,17 +1,13 @@
-from contextlib import asynccontextmanager
-from typing import TYPE_CHECKING
+import hashlib
 
 from redis import asyncio as redis_lib
+from redis.asyncio.lock import Lock
 from redis.asyncio.retry import Retry
 from redis.backoff import ExponentialBackoff
 
 from .config import config
 
 
-if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator
-
-
 redis = redis_lib.from_url(
     config.cache_connection_url,
     encoding='utf-8',
@@ -20,29 +16,46 @@ redis = redis_lib.from_url(
     retry=Retry(ExponentialBackoff(cap=1), 3),
 )
 
+_token_key_salt = hashlib.blake2b(config.TOKEN_KEY_SALT.get_secret_value().encode()).digest()
+
+
+class InstanceLock:
+    def __init__(self, lock: Lock) -> None:
+        self._lock = lock
+        self._acquired = False
 
-@asynccontextmanager
-async def instance_lock(challenge: str, team_id: str) -> AsyncGenerator[bool]:
-    lock = redis.lock(
-        f'{config.PREFIX}:locks:instance:{challenge}:{team_id}',
-        timeout=config.REDIS_LOCK_TIMEOUT_SECONDS,
-        blocking_timeout=config.REDIS_LOCK_BLOCKING_TIMEOUT_SECONDS,
+    async def __aenter__(self) -> bool:
+        self._acquired = await self._lock.acquire(blocking=True)
+        return self._acquired
+
+    async def __aexit__(self, *_: object) -> None:
+        if self._acquired:
+            await self._lock.release()
+
+
+def instance_lock(challenge: str, team_id: str) -> InstanceLock:
+    return InstanceLock(
+        redis.lock(
+            f'{config.PREFIX}:locks:instance:{challenge}:{team_id}',
+            timeout=config.REDIS_LOCK_TIMEOUT_SECONDS,
+            blocking_timeout=config.REDIS_LOCK_BLOCKING_TIMEOUT_SECONDS,
+        )
     )
 
-    acquired = await lock.acquire(blocking=True)
-    try:
-        yield acquired
-    finally:
-        await lock.release()
+
+def _token_key(token: str) -> str:
+    # Never store raw tokens in redis, only a keyed digest of them
+    digest = hashlib.blake2b(token.encode(), digest_size=16, key=_token_key_salt).hexdigest()
+    return f'{config.PREFIX}:tokens:{digest}'
 
 
 async def cache_token(token: str, team_id: str) -> None:
     await redis.set(
-        f'{config.PREFIX}:tokens:{token}',
+        _token_key(token),
         team_id,
         ex=config.AUTH_CACHE_LIFE_TIME,
     )
 
 
 async def try_get_team_id_by_token(token: str) -> str | None:
-    return await redis.get(f'{config.PREFIX}:tokens:{token}')
+    return await redis.get(_token_key(token))
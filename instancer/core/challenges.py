@@ -1,17 +1,41 @@
-import re
 from enum import StrEnum
+from functools import cached_property
 from pathlib import Path
 from typing import Self
 
 import yaml
 from fastapi import HTTPException
-from pydantic import BaseModel, Field, TypeAdapter, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator, model_validator
 
 from instancer.core.config import config
 from instancer.util.logger import logger
 
 
 NANO_CPU_SCALE = 1_000_000_000
+# Translation table deleting every allowed name character, anything left over is invalid
+NAME_ALLOWED_CHARS_TABLE = str.maketrans('', '', 'abcdefghijklmnopqrstuvwxyz0123456789-')
+# Longest suffixes go first so that e.g. "mb" isn't matched as "b"
+MEMORY_SUFFIXES = tuple(
+    sorted(
+        {
+            'b': 1,
+            'k': 1024,
+            'kb': 1024,
+            'ki': 1024,
+            'm': 1024**2,
+            'mb': 1024**2,
+            'mi': 1024**2,
+            'g': 1024**3,
+            'gb': 1024**3,
+            'gi': 1024**3,
+            't': 1024**4,
+            'tb': 1024**4,
+        }.items(),
+        key=lambda item: -len(item[0]),
+    )
+)
+
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 
 class ExposeKind(StrEnum):
@@ -29,7 +53,7 @@ def expose_kind_to_port(kind: ExposeKind) -> int:
 
 
 def require_valid_name(name: str) -> None:
-    if not re.fullmatch(r'[a-z0-9-]+', name):
+    if not name or name.translate(NAME_ALLOWED_CHARS_TABLE):
         msg = f'Name "{name}" is invalid. It must match [a-z0-9-]+.'
         raise ValueError(msg)
 
@@ -42,6 +66,8 @@ class Container(BaseModel):
         cap_drop: list[str] = Field(default_factory=lambda: ['ALL'])
 
     class Limits(BaseModel):
+        model_config = ConfigDict(frozen=True)
+
         class Ulimit(BaseModel):
             name: str
             soft: int
@@ -56,55 +82,31 @@ class Container(BaseModel):
             ]
         )
 
-        _memory_bytes: int | None = None
-        _nano_cpus: int | None = None
-
-        @property
+        @cached_property
         def nano_cpus(self) -> int:
-            if self._nano_cpus is not None:
-                return self._nano_cpus
-
             if not self.cpu:
-                self._nano_cpus = 0
-                return self._nano_cpus
+                return 0
 
             if self.cpu.endswith('m'):
                 millicores = int(self.cpu[:-1])
-                self._nano_cpus = (millicores * NANO_CPU_SCALE) // 1000
-                return self._nano_cpus
+                return (millicores * NANO_CPU_SCALE) // 1000
 
             cores = float(self.cpu)
-            self._nano_cpus = int(cores * NANO_CPU_SCALE)
-            return self._nano_cpus
+            return int(cores * NANO_CPU_SCALE)
 
-        @property
+        @cached_property
         def memory_bytes(self) -> int:
-            if self._memory_bytes is not None:
-                return self._memory_bytes
-
-            suffixes = {
-                'b': 1,
-                'k': 1024,
-                'kb': 1024,
-                'ki': 1024,
-                'm': 1024**2,
-                'mb': 1024**2,
-                'mi': 1024**2,
-                'g': 1024**3,
-                'gb': 1024**3,
-                'gi': 1024**3,
-                't': 1024**4,
-                'tb': 1024**4,
-            }
             mem = self.memory.lower()
-            for suffix, multiplier in suffixes.items():
+            for suffix, multiplier in MEMORY_SUFFIXES:
                 if mem.endswith(suffix):
                     number = float(mem[: -len(suffix)])
-                    self._memory_bytes = int(number * multiplier)
-                    return self._memory_bytes
+                    return int(number * multiplier)
 
-            self._memory_bytes = int(mem)
-            return self._memory_bytes
+            return int(mem)
+
+        @cached_property
+        def ulimits_config(self) -> list[dict[str, str | int]]:
+            return [{'Name': ulimit.name, 'Soft': ulimit.soft, 'Hard': ulimit.hard} for ulimit in self.ulimits]
 
     name: str
     image: str
@@ -119,6 +121,10 @@ class Container(BaseModel):
         require_valid_name(v)
         return v
 
+    @cached_property
+    def env_list(self) -> list[str]:
+        return [f'{k}={v}' for k, v in self.env.items()]
+
     @model_validator(mode='after')
     def validate_model(self) -> Self:
         if not self.security.read_only_fs:
@@ -156,11 +162,25 @@ class Challenge(BaseModel):
         require_valid_name(v)
         return v
 
+    @cached_property
+    def container_names(self) -> frozenset[str]:
+        return frozenset(container.name for container in self.containers)
+
+    @cached_property
+    def exposes_by_container(self) -> dict[str, list[tuple[int, Expose]]]:
+        result: dict[str, list[tuple[int, Expose]]] = {}
+        for i, expose in enumerate(self.expose):
+            result.setdefault(expose.container_name, []).append((i, expose))
+        return result
+
+    @cached_property
+    def endpoint_ports(self) -> tuple[tuple[ExposeKind, int], ...]:
+        return tuple((expose.kind, expose_kind_to_port(expose.kind)) for expose in self.expose)
+
     @model_validator(mode='after')
     def validate_model(self) -> Self:
-        container_names = {container.name for container in self.containers}
         for expose in self.expose:
-            if expose.container_name in container_names:
+            if expose.container_name in self.container_names:
                 continue
 
             msg = f'Expose references unknown container "{expose.container_name}" in challenge "{self.name}".'
@@ -169,11 +189,14 @@ class Challenge(BaseModel):
         return self
 
 
+_challenge_adapter = TypeAdapter(Challenge)
+
+
 def load_challenges() -> dict[str, Challenge]:
     result: dict[str, Challenge] = {}
 
-    for item in yaml.safe_load_all(Path(config.CHALLENGES_YAML_PATH).read_bytes()):
-        challenge = TypeAdapter(Challenge).validate_python(item)
+    for item in yaml.load_all(Path(config.CHALLENGES_YAML_PATH).read_bytes(), Loader=_YamlLoader):
+        challenge = _challenge_adapter.validate_python(item)
         result[challenge.name] = challenge
 
     logger.info(f'Loaded {len(result)} challenges.')
@@ -185,6 +208,6 @@ challenges = load_challenges()
 
 def get_challenge(challenge_name: str) -> Challenge:
     result = challenges.get(challenge_name)
-    if not result:
+    if result is None:
         raise HTTPException(status_code=404, detail='Challenge not found')
     return result
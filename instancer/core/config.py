@@ -1,4 +1,5 @@
 from enum import StrEnum
+from functools import cached_property
 from pathlib import Path
 
 from pydantic import SecretStr, field_validator
@@ -33,6 +34,7 @@ class Settings(BaseSettings):
     CHALLENGES_YAML_PATH: str = str(ROOT_DIR / 'challenges.yaml')
     CHALLENGES_PATH: str = str(ROOT_DIR / 'challenges')
     TEMPLATES_PATH: str = str(ROOT_DIR / 'templates')
+    BUILD_CACHE_PATH: str = str(ROOT_DIR / '.build-cache.json')
 
     TRAEFIK_CONTAINER_NAME: str = 'traefik'
     TRAEFIK_HTTP_ENTRYPOINT: str = 'web'
@@ -61,9 +63,12 @@ class Settings(BaseSettings):
     HCAPTCHA_SITE_KEY: str | None = None
 
     AUTH_CACHE_LIFE_TIME: int = 3600 * 24 * 14
+    AUTH_NEGATIVE_CACHE_LIFE_TIME: int = 60
+    AUTH_LOCAL_CACHE_SIZE: int = 4096
+    TOKEN_KEY_SALT: SecretStr = SecretStr('')
     AUTH_PLATFORM_URL: str | None = None
 
-    @property
+    @cached_property
     def cache_connection_url(self) -> str:
         return f'redis://:{self.REDIS_PASSWORD.get_secret_value()}@{self.REDIS_HOST}:{self.REDIS_PORT_NUMBER}'
 
@@ -7,19 +7,17 @@ from functools import cache
 
 from aiodocker import Docker, DockerError
 from aiodocker.containers import DockerContainer
+from aiodocker.networks import DockerNetwork
 from fastapi import HTTPException
 from pydantic import BaseModel
 
 from instancer.core.cache import instance_lock
-from instancer.core.challenges import Challenge, Container, ExposeKind, expose_kind_to_port, get_challenge
+from instancer.core.challenges import Challenge, Container, ExposeKind, get_challenge
 from instancer.core.config import config
 from instancer.util.logger import logger
 from instancer.util.time import timestamp
 
 
-NOT_ACQUIRED_ERROR = HTTPException(status_code=400, detail='Another instance operation is in progress.')
-
-
 class InstanceStatus(StrEnum):
     STOPPED = 'stopped'
     RUNNING = 'running'
@@ -88,11 +86,12 @@ async def is_running(challenge_name: str, team_id: str) -> bool:
 
 
 async def _ensure_network(name: str, *, internal: bool, expires_at: int) -> None:
+    docker = get_docker()
     try:
-        network = await get_docker().networks.get(name)
+        network = await docker.networks.get(name)
     except DockerError:
         try:
-            network = await get_docker().networks.create(
+            network = await docker.networks.create(
                 {
                     'Name': name,
                     'Driver': 'bridge',
@@ -132,77 +131,126 @@ def _add_expose_labels(
     team_id: str,
     instance_id: str,
 ) -> None:
-    for i, expose in enumerate(challenge.expose):
-        if expose.container_name != container.name:
-            continue
-
+    for i, expose in challenge.exposes_by_container.get(container.name, ()):
         router_name = f'{config.PREFIX}-{challenge.name}-{team_id}-{instance_id}-{container.name}-{i}'
 
         match expose.kind:
             case ExposeKind.TCP:
-                labels[f'traefik.tcp.routers.{router_name}.rule'] = f'HostSNI(`{host}`)'
-                labels[f'traefik.tcp.routers.{router_name}.entrypoints'] = config.TRAEFIK_TCP_ENTRYPOINT
-                labels[f'traefik.tcp.routers.{router_name}.service'] = router_name
-                labels[f'traefik.tcp.routers.{router_name}.tls.passthrough'] = 'true'
-                labels[f'traefik.tcp.services.{router_name}.loadbalancer.server.port'] = str(expose.container_port)
+                router = f'traefik.tcp.routers.{router_name}'
+                labels.update(
+                    {
+                        f'{router}.rule': f'HostSNI(`{host}`)',
+                        f'{router}.entrypoints': config.TRAEFIK_TCP_ENTRYPOINT,
+                        f'{router}.service': router_name,
+                        f'{router}.tls.passthrough': 'true',
+                        f'traefik.tcp.services.{router_name}.loadbalancer.server.port': str(expose.container_port),
+                    }
+                )
 
             case ExposeKind.HTTP:
-                labels[f'traefik.http.routers.{router_name}.rule'] = f'Host(`{host}`)'
-                labels[f'traefik.http.routers.{router_name}.entrypoints'] = config.TRAEFIK_HTTP_ENTRYPOINT
-                labels[f'traefik.http.routers.{router_name}.service'] = router_name
-                labels[f'traefik.http.services.{router_name}.loadbalancer.server.port'] = str(expose.container_port)
+                router = f'traefik.http.routers.{router_name}'
+                labels.update(
+                    {
+                        f'{router}.rule': f'Host(`{host}`)',
+                        f'{router}.entrypoints': config.TRAEFIK_HTTP_ENTRYPOINT,
+                        f'{router}.service': router_name,
+                        f'traefik.http.services.{router_name}.loadbalancer.server.port': str(expose.container_port),
+                    }
+                )
 
             case ExposeKind.HTTPS:
-                labels[f'traefik.http.routers.{router_name}.rule'] = f'Host(`{host}`)'
-                labels[f'traefik.http.routers.{router_name}.entrypoints'] = config.TRAEFIK_HTTPS_ENTRYPOINT
-                labels[f'traefik.http.routers.{router_name}.tls'] = 'true'
-                labels[f'traefik.http.routers.{router_name}.service'] = router_name
-                labels[f'traefik.http.services.{router_name}.loadbalancer.server.port'] = str(expose.container_port)
+                router = f'traefik.http.routers.{router_name}'
+                labels.update(
+                    {
+                        f'{router}.rule': f'Host(`{host}`)',
+                        f'{router}.entrypoints': config.TRAEFIK_HTTPS_ENTRYPOINT,
+                        f'{router}.tls': 'true',
+                        f'{router}.service': router_name,
+                        f'traefik.http.services.{router_name}.loadbalancer.server.port': str(expose.container_port),
+                    }
+                )
 
 
 def _get_endpoints(challenge: Challenge, host: str | None) -> list[Instance.Endpoint] | None:
     return (
         [
             Instance.Endpoint(
-                kind=expose.kind,
+                kind=kind,
                 host=host,
-                port=expose_kind_to_port(expose.kind),
+                port=port,
             )
-            for expose in challenge.expose
+            for kind, port in challenge.endpoint_ports
         ]
         if host
         else None
     )
 
 
+async def _ensure_image(image: str) -> None:
+    docker = get_docker()
+    try:
+        await docker.images.get(image)
+    except DockerError:
+        await docker.images.pull(image)
+
+
+async def _create_containers(
+    create_requests: list[tuple[str, dict]],
+    created_containers: list[tuple[str, DockerContainer]],
+) -> None:
+    containers = get_docker().containers
+    results = await asyncio.gather(
+        *(
+            containers.create(config=create_config, name=container_name)
+            for container_name, create_config in create_requests
+        ),
+        return_exceptions=True,
+    )
+
+    errors: list[BaseException] = []
+    for (container_name, _), result in zip(create_requests, results, strict=True):
+        if isinstance(result, BaseException):
+            errors.append(result)
+            continue
+
+        created_containers.append((container_name, result))
+
+    if errors:
+        raise errors[0]
+
+
 async def _cleanup_containers(containers: list[tuple[str, DockerContainer]]) -> None:
     if not containers:
         return
 
-    delete_coroutines: list = []
-    names: list[str] = []
-    for name, container in containers:
-        delete_coroutines.append(container.delete(force=True))
-        names.append(name)
+    await asyncio.gather(*(container.delete(force=True) for _, container in containers))
 
-    await asyncio.gather(*delete_coroutines)
+
+async def _get_network_with_details(name: str) -> tuple[DockerNetwork, dict] | None:
+    docker = get_docker()
+    try:
+        # `networks.get` already does the inspect request but drops the result, so query it directly
+        details = await docker._query_json(f'networks/{name}', method='GET')  # noqa: SLF001
+    except DockerError as err:
+        if err.status != http.HTTPStatus.NOT_FOUND.value:
+            logger.opt(exception=err).warning(f'Failed to fetch network during rollback cleanup: {name}')
+        return None
+
+    return DockerNetwork(docker, details['Id']), details
 
 
 async def _cleanup_networks(names: list[str]) -> None:
     if not names:
         return
 
+    networks = await asyncio.gather(*(_get_network_with_details(name) for name in names))
+
     delete_coroutines: list = []
-    existing_names: list[str] = []
-    for name in names:
-        try:
-            network = await get_docker().networks.get(name)
-        except DockerError as err:
-            if err.status != http.HTTPStatus.NOT_FOUND.value:
-                logger.opt(exception=err).warning(f'Failed to fetch network during rollback cleanup: {name}')
+    for name, fetched in zip(names, networks, strict=True):
+        if fetched is None:
             continue
 
-        details = await network.show()
+        network, details = fetched
         for conn in (details['Containers'] or {}).values():
             logger.info(f'Disconnecting container {conn["Name"]} from network {name} during rollback cleanup')
             await network.disconnect(
@@ -213,7 +261,6 @@ async def _cleanup_networks(names: list[str]) -> None:
             )
 
         delete_coroutines.append(network.delete())
-        existing_names.append(name)
 
     if not delete_coroutines:
         return
@@ -225,7 +272,7 @@ async def start_instance(challenge_name: str, team_id: str) -> Instance:
     challenge = get_challenge(challenge_name)
     async with instance_lock(challenge_name, team_id) as acquired:
         if not acquired:
-            raise NOT_ACQUIRED_ERROR
+            raise HTTPException(status_code=400, detail='Another instance operation is in progress.')
 
         if await is_running(challenge_name, team_id):
             raise HTTPException(status_code=400, detail='Instance is already running')
@@ -250,12 +297,12 @@ async def start_instance(challenge_name: str, team_id: str) -> Instance:
                 await _ensure_network(eg_net, internal=False, expires_at=expires_at)
                 networks_created.append(eg_net)
 
-            for container in challenge.containers:
-                try:
-                    await get_docker().images.get(container.image)
-                except DockerError:
-                    await get_docker().images.pull(container.image)
+            await asyncio.gather(
+                *(_ensure_image(image) for image in dict.fromkeys(c.image for c in challenge.containers))
+            )
 
+            create_requests: list[tuple[str, dict]] = []
+            for container in challenge.containers:
                 labels: dict[str, str] = {
                     ContainerLabels.MANAGED_BY: config.DOCKER_MANAGER_NAME,
                     ContainerLabels.CHALLENGE: challenge_name,
@@ -280,40 +327,40 @@ async def start_instance(challenge_name: str, team_id: str) -> Instance:
 
                 container_name = f'{config.PREFIX}-{challenge_name}-{team_id}-{container.name}'
                 logger.info(f'Spinning up container {container_name=} {challenge_name=} {team_id=}')
-                created_container = await get_docker().containers.create(
-                    config={
-                        'Hostname': container.name,
-                        'Image': container.image,
-                        'Env': [f'{k}={v}' for k, v in container.env.items()],
-                        'Labels': labels,
-                        'HostConfig': {
-                            'RestartPolicy': {
-                                'Name': 'unless-stopped',
+                create_requests.append(
+                    (
+                        container_name,
+                        {
+                            'Hostname': container.name,
+                            'Image': container.image,
+                            'Env': container.env_list,
+                            'Labels': labels,
+                            'HostConfig': {
+                                'RestartPolicy': {
+                                    'Name': 'unless-stopped',
+                                },
+                                'ReadOnlyRootfs': container.security.read_only_fs,
+                                'Tmpfs': {'/tmp': 'noexec,nosuid,nodev'} if container.security.read_only_fs else {},  # noqa: S108
+                                'SecurityOpt': container.security.security_opt,
+                                'Memory': container.limits.memory_bytes,
+                                'MemorySwap': container.limits.memory_bytes,
+                                'NanoCpus': container.limits.nano_cpus,
+                                'PidsLimit': container.limits.pids_limit,
+                                'CapAdd': container.security.cap_add,
+                                'CapDrop': container.security.cap_drop,
+                                'LogConfig': {
+                                    'Type': 'json-file',
+                                },
+                                'Ulimits': container.limits.ulimits_config,
                             },
-                            'ReadOnlyRootfs': container.security.read_only_fs,
-                            'Tmpfs': {'/tmp': 'noexec,nosuid,nodev'} if container.security.read_only_fs else {},  # noqa: S108
-                            'SecurityOpt': container.security.security_opt,
-                            'Memory': container.limits.memory_bytes,
-                            'MemorySwap': container.limits.memory_bytes,
-                            'NanoCpus': container.limits.nano_cpus,
-                            'PidsLimit': container.limits.pids_limit,
-                            'CapAdd': container.security.cap_add,
-                            'CapDrop': container.security.cap_drop,
-                            'LogConfig': {
-                                'Type': 'json-file',
+                            'NetworkingConfig': {
+                                'EndpointsConfig': endpoints_config,
                             },
-                            'Ulimits': [
-                                {'Name': ulimit.name, 'Soft': ulimit.soft, 'Hard': ulimit.hard}
-                                for ulimit in container.limits.ulimits
-                            ],
-                        },
-                        'NetworkingConfig': {
-                            'EndpointsConfig': endpoints_config,
                         },
-                    },
-                    name=container_name,
+                    )
                 )
-                created_containers.append((container_name, created_container))
+
+            await _create_containers(create_requests, created_containers)
 
             start_tasks = [container.start() for _, container in created_containers]
             await asyncio.gather(*start_tasks)
@@ -338,7 +385,7 @@ async def start_instance(challenge_name: str, team_id: str) -> Instance:
 async def stop_instance(challenge_name: str, team_id: str) -> Instance:
     async with instance_lock(challenge_name, team_id) as acquired:
         if not acquired:
-            raise NOT_ACQUIRED_ERROR
+            raise HTTPException(status_code=400, detail='Another instance operation is in progress.')
 
         instance_containers = await get_containers(challenge_name, team_id)
         if not instance_containers:
@@ -347,8 +394,8 @@ async def stop_instance(challenge_name: str, team_id: str) -> Instance:
         networks_to_remove: set[str] = set()
         stop_tasks = []
 
-        for container in instance_containers:
-            details = await container.show()
+        details_list = await asyncio.gather(*(container.show() for container in instance_containers))
+        for container, details in zip(instance_containers, details_list, strict=True):
             for net_name in details['NetworkSettings']['Networks']:
                 # Remove only our stuff
                 if not net_name.startswith(f'{config.PREFIX}-'):
@@ -363,10 +410,11 @@ async def stop_instance(challenge_name: str, team_id: str) -> Instance:
         await asyncio.gather(*[c.delete(force=True) for c in instance_containers], return_exceptions=True)
         logger.info(f'Removed {len(instance_containers)} containers.')
 
+        networks = get_docker().networks
         net_remove_tasks = []
         net_disconnect_tasks = []
         for net_name in networks_to_remove:
-            network = await get_docker().networks.get(net_name)
+            network = await networks.get(net_name)
 
             # Disconnect everyone.
             # Doing show for the second time to reflect changes after container deletions.
@@ -403,9 +451,8 @@ async def get_instance(challenge_name: str, team_id: str) -> Instance:
     expires_at: int | None = None
     host: str | None = None
     if containers:
-        details = await containers[0].show()
-        labels = details['Config']['Labels']
-        state = details['State']['Status']
+        labels = containers[0]['Labels']
+        state = containers[0]['State']
 
         expires_at = int(labels[ContainerLabels.EXPIRES_AT])
         host = labels[ContainerLabels.TARGET_HOSTNAME]
@@ -420,6 +467,17 @@ async def get_instance(challenge_name: str, team_id: str) -> Instance:
     )
 
 
+async def _safe_stop_instance(challenge: str, team_id: str, container_id: str) -> None:
+    try:
+        await stop_instance(challenge, team_id)
+    except HTTPException as err:
+        logger.opt(exception=err).warning(
+            f'Prunner failed to stop expired container {container_id=} via stop_instance, will try again'
+        )
+    except DockerError as err:
+        logger.opt(exception=err).warning(f'Prunner failed to remove expired container {container_id=}')
+
+
 async def _prune_instances(docker: Docker, now: int) -> None:
     # TODO(es3n1n): Is there a way how to query containers by label value comparison?
     containers = await docker.containers.list(
@@ -431,13 +489,9 @@ async def _prune_instances(docker: Docker, now: int) -> None:
         },
     )
 
+    expired: dict[tuple[str, str], str] = {}
     for container in containers:
-        try:
-            details = await container.show()
-        except DockerError:
-            # Got deleted already
-            continue
-        labels = details['Config']['Labels']
+        labels = container['Labels']
 
         expires_at = int(labels[ContainerLabels.EXPIRES_AT])
         if expires_at > now:
@@ -446,15 +500,14 @@ async def _prune_instances(docker: Docker, now: int) -> None:
         challenge = labels[ContainerLabels.CHALLENGE]
         team_id = labels[ContainerLabels.TEAM_ID]
         logger.info(f'Prunner stopping expired container {container.id=} {challenge=} {team_id=} {expires_at=} {now=}')
+        expired.setdefault((challenge, team_id), container.id)
 
-        try:
-            await stop_instance(challenge, team_id)
-        except HTTPException as err:
-            logger.opt(exception=err).warning(
-                f'Prunner failed to stop expired container {container.id=} via stop_instance, will try again'
-            )
-        except DockerError as err:
-            logger.opt(exception=err).warning(f'Prunner failed to remove expired container {container.id=}')
+    await asyncio.gather(
+        *(
+            _safe_stop_instance(challenge, team_id, container_id)
+            for (challenge, team_id), container_id in expired.items()
+        )
+    )
 
 
 async def _prune_networks(docker: Docker, now: int) -> None:
@@ -467,10 +520,13 @@ async def _prune_networks(docker: Docker, now: int) -> None:
         }
     )
 
+    # NOTE(es3n1n): Going for a private method as I dont want to do the inspect request 2 times / network
+    details_list = await asyncio.gather(
+        *(docker._query_json(f'networks/{network["Id"]}', method='GET') for network in networks)  # noqa: SLF001
+    )
+
     names_to_prune: list[str] = []
-    for network in networks:
-        # NOTE(es3n1n): Going for a private method as I dont want to do the inspect request 2 times / network
-        details = await docker._query_json(f'networks/{network["Id"]}', method='GET')  # noqa: SLF001
+    for network, details in zip(networks, details_list, strict=True):
         labels = details['Labels']
 
         expires_at = int(labels[ContainerLabels.EXPIRES_AT])
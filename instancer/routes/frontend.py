@@ -1,7 +1,11 @@
+import hashlib
 import http
+from functools import cache
+from pathlib import Path
 
+import orjson
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 
 from instancer.core.challenges import get_challenge
@@ -11,15 +15,37 @@ from instancer.core.config import config
 router = APIRouter(include_in_schema=False)
 templates = Jinja2Templates(directory=config.TEMPLATES_PATH)
 
+AUTH_PLATFORM_URL = config.AUTH_PLATFORM_URL
+HCAPTCHA_SITE_KEY = config.HCAPTCHA_SITE_KEY if config.is_hcaptcha_config_set else None
+ROOT_RESPONSE_BODY = orjson.dumps({'detail': 'Use /challenges/<challenge_name> to access specific challenge.'})
+
+
+def warm_templates() -> None:
+    for name in ('auth.html', 'index.html'):
+        templates.get_template(name)
+
+
+@cache
+def _get_challenge_etag(challenge_name: str) -> str:
+    template_mtime = Path(config.TEMPLATES_PATH, 'index.html').stat().st_mtime_ns
+    key = f'{challenge_name}:{HCAPTCHA_SITE_KEY}:{template_mtime}'
+    return f'"{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    return any(tag.strip().removeprefix('W/') in {etag, '*'} for tag in if_none_match.split(','))
+
 
 @router.get('/')
-async def get_frontend_root() -> dict[str, str]:
-    return {'detail': 'Use /challenges/<challenge_name> to access specific challenge.'}
+async def get_frontend_root() -> Response:
+    return Response(content=ROOT_RESPONSE_BODY, media_type='application/json')
 
 
 @router.get('/auth')
 async def get_frontend_auth(request: Request, state: str, token: str | None = None) -> HTMLResponse:
-    if not config.AUTH_PLATFORM_URL:
+    if not AUTH_PLATFORM_URL:
         raise HTTPException(
             status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR.value, detail='Auth platform url is not set'
         )
@@ -31,19 +57,25 @@ async def get_frontend_auth(request: Request, state: str, token: str | None = No
         context={
             'challenge': challenge_item,
             'token': token,
-            'auth_platform_url': config.AUTH_PLATFORM_URL,
+            'auth_platform_url': AUTH_PLATFORM_URL,
         },
     )
 
 
 @router.get('/challenges/{challenge_name}')
-async def get_challenge_frontend(request: Request, challenge_name: str) -> HTMLResponse:
+async def get_challenge_frontend(request: Request, challenge_name: str) -> Response:
     challenge = get_challenge(challenge_name)
-    return templates.TemplateResponse(
+    etag = _get_challenge_etag(challenge.name)
+    if _etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=http.HTTPStatus.NOT_MODIFIED.value, headers={'ETag': etag})
+
+    response = templates.TemplateResponse(
         request=request,
         name='index.html',
         context={
             'challenge': challenge,
-            'hcaptcha_site_key': config.HCAPTCHA_SITE_KEY if config.is_hcaptcha_config_set else None,
+            'hcaptcha_site_key': HCAPTCHA_SITE_KEY,
         },
     )
+    response.headers['ETag'] = etag
+    return response
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Request
 
 from instancer.core import instances
 from instancer.core.auth import AuthSession
-from instancer.util.hcaptcha import HCaptchaForm
+from instancer.util.hcaptcha import CaptchaForm
 
 
 router = APIRouter(
@@ -21,7 +21,7 @@ async def get_instance(
 
 @router.put('/{challenge_name}')
 async def start_instance(
-    request: Request, challenge_name: str, session: AuthSession, form: HCaptchaForm
+    request: Request, challenge_name: str, session: AuthSession, form: CaptchaForm
 ) -> instances.Instance:
     await form.validate_captcha(request)
     return await instances.start_instance(challenge_name, session.team_id)
@@ -29,7 +29,7 @@ async def start_instance(
 
 @router.delete('/{challenge_name}')
 async def stop_instance(
-    request: Request, challenge_name: str, session: AuthSession, form: HCaptchaForm
+    request: Request, challenge_name: str, session: AuthSession, form: CaptchaForm
 ) -> instances.Instance:
     await form.validate_captcha(request)
     return await instances.stop_instance(challenge_name, session.team_id)
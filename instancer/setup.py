@@ -1,26 +1,41 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import TYPE_CHECKING, Any
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from instancer.core.auth import auth_provider
 from instancer.core.cache import redis
 from instancer.routes.frontend import router as frontend_router
+from instancer.routes.frontend import warm_templates
 from instancer.routes.v1.instances import router as instances_router
+from instancer.util.hcaptcha import hcaptcha_client
 
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
 
+async def _close_redis() -> None:
+    await redis.close()
+    await redis.connection_pool.disconnect()
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncGenerator[None, Any]:
-    await redis.ping()
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(redis.ping())
+        tg.create_task(asyncio.to_thread(warm_templates))
 
     try:
         yield
     finally:
-        await redis.close()
-        await redis.connection_pool.disconnect()
+        await asyncio.gather(
+            _close_redis(),
+            auth_provider.close(),
+            hcaptcha_client.aclose(),
+        )
 
 
 app = FastAPI(
@@ -29,6 +44,7 @@ app = FastAPI(
     version='1.0.0',
     redoc_url=None,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 app.include_router(frontend_router)
 app.include_router(instances_router)
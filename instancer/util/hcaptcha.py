@@ -1,12 +1,27 @@
+from typing import Annotated
+from urllib.parse import quote_plus
+
 import orjson
-from fastapi import HTTPException, Request
-from httpx import AsyncClient, HTTPError
+from fastapi import Depends, HTTPException, Request
+from httpx import AsyncClient, HTTPError, Limits, Timeout
 from pydantic import BaseModel
 
 from instancer.core.config import config
 from instancer.util.logger import logger
 
 
+hcaptcha_client = AsyncClient(
+    http2=True,
+    timeout=Timeout(5.0, connect=1.0),
+    limits=Limits(max_connections=20, max_keepalive_connections=10),
+)
+
+
+_HCAPTCHA_SECRET = config.HCAPTCHA_SECRET.get_secret_value() if config.HCAPTCHA_SECRET else None
+_VERIFY_BODY_PREFIX = f'secret={quote_plus(_HCAPTCHA_SECRET)}' if _HCAPTCHA_SECRET else ''
+_VERIFY_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
 class HCaptchaForm(BaseModel):
     captcha: str | None = None
 
@@ -26,27 +41,36 @@ class HCaptchaForm(BaseModel):
             raise HTTPException(status_code=400, detail='Captcha validation failed')
 
 
+_EMPTY_CAPTCHA_FORM = HCaptchaForm()
+
+
+async def _get_empty_captcha_form() -> HCaptchaForm:
+    return _EMPTY_CAPTCHA_FORM
+
+
+CaptchaForm = (
+    HCaptchaForm if config.is_hcaptcha_config_set else Annotated[HCaptchaForm, Depends(_get_empty_captcha_form)]
+)
+
+
 async def verify_hcaptcha(response: str, remote_ip: str | None = None) -> bool:
-    if not config.HCAPTCHA_SECRET:
+    if not _HCAPTCHA_SECRET:
         logger.error('HCaptcha secret is not set!')
         return False
 
-    data = {
-        'secret': config.HCAPTCHA_SECRET.get_secret_value(),
-        'response': response,
-    }
+    body = f'{_VERIFY_BODY_PREFIX}&response={quote_plus(response)}'
 
     if remote_ip is not None:
-        data['remoteip'] = remote_ip
+        body += f'&remoteip={quote_plus(remote_ip)}'
 
     try:
-        async with AsyncClient() as client:
-            r = await client.post(
-                'https://hcaptcha.com/siteverify',
-                data=data,
-            )
-            r.raise_for_status()
-            api_response = orjson.loads(r.content)
+        r = await hcaptcha_client.post(
+            'https://hcaptcha.com/siteverify',
+            content=body.encode(),
+            headers=_VERIFY_HEADERS,
+        )
+        r.raise_for_status()
+        api_response = orjson.loads(r.content)
     except HTTPError as err:
         raise HTTPException(status_code=500, detail='Internal hcaptcha error') from err
 
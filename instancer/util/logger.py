@@ -3,20 +3,32 @@ import sys
 from typing import Any
 
 from loguru import logger
-from uvicorn.config import LOGGING_CONFIG
 
 from instancer.core.config import config
 
 
-class LoguruHandler(logging.Handler):
-    def emit(self, record: logging.LogRecord) -> None:
+_LOGGING_FILE = logging.__file__
+_MAX_FRAME_DEPTH = 20
+_LEVEL_CACHE: dict[str, str] = {}
+
+
+def _get_level(level_name: str) -> str:
+    level = _LEVEL_CACHE.get(level_name)
+    if level is None:
         try:
-            level = logger.level(record.levelname).name
+            level = logger.level(level_name).name
         except ValueError:
-            level = record.levelname
+            level = level_name
+        _LEVEL_CACHE[level_name] = level
+    return level
+
+
+class LoguruHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        level = _get_level(record.levelname)
 
         frame, depth = logging.currentframe(), 2
-        while frame.f_code.co_filename == logging.__file__:
+        while depth < _MAX_FRAME_DEPTH and frame.f_code.co_filename == _LOGGING_FILE:
             if frame.f_back is None:
                 break
 
@@ -29,10 +41,12 @@ class LoguruHandler(logging.Handler):
         )
 
 
+_MIN_LEVEL_NO: int = logger.level('DEBUG' if config.DEV_ENV else 'INFO').no
+_ERROR_LEVEL_NO: int = logger.level('ERROR').no
+
+
 def _filter_min_level(record: dict) -> bool:
-    current_level_name: str = 'DEBUG' if config.DEV_ENV else 'INFO'
-    current_level: int = logger.level(current_level_name).no
-    return record['level'].no >= current_level
+    return record['level'].no >= _MIN_LEVEL_NO
 
 
 def _filter_stderr(record: dict) -> bool:
@@ -41,20 +55,19 @@ def _filter_stderr(record: dict) -> bool:
 
 def _filter_stdout(record: dict) -> bool:
     record_no: int = record['level'].no
-    error_no: int = logger.level('ERROR').no
-    return _filter_min_level(record) and record_no != error_no
+    return record_no >= _MIN_LEVEL_NO and record_no != _ERROR_LEVEL_NO
 
 
 def init_logger() -> None:
     loguru_handler = LoguruHandler()
-    logging.basicConfig(handlers=[loguru_handler])
-
-    for key in LOGGING_CONFIG['handlers']:
-        handler_conf = LOGGING_CONFIG['handlers'][key]
-
-        handler_conf['class'] = 'instancer.util.logger.LoguruHandler'
-        if 'stream' in handler_conf:
-            handler_conf.pop('stream')
+    logging.root.handlers = [loguru_handler]
+
+    # uvicorn is started with log_config=None, so its loggers are routed here instead of through its dict config
+    for name in ('uvicorn', 'uvicorn.access'):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = [loguru_handler]
+        uvicorn_logger.setLevel(logging.INFO)
+        uvicorn_logger.propagate = False
 
     fmt = (
         '<level>{time}</level> | <level>{level: <8}</level> | '